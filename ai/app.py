@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
 import requests
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 # IMPORT BARU: Menggunakan datetime dari modul datetime
 from datetime import datetime
 from flask_cors import CORS 
@@ -11,8 +11,11 @@ import time
 import paho.mqtt.client as mqtt
 import json
 import socket 
+import threading
 # Asumsi file database_setup.py ada di direktori yang sama
-from database_setup import get_db_connection 
+from database_setup import get_db_connection, migrate_database
+from rollup import DEFAULT_CAMERA_ID, ROLLUP_GRANULARITIES, apply_rollup, query_rollups
+from event_session import EventSessionManager, Frame, SESSION_SWEEP_INTERVAL
 
 app = Flask(__name__)
 # ==================================================================
@@ -21,30 +24,46 @@ app = Flask(__name__)
 CORS(app) 
 
 # --- Konfigurasi ---
-INVESTIGATION_FOLDER = "/mnt/d/xampp-8.1/htdocs/sensor-motion/foto-investigation/"
-MQTT_BROKER = "127.0.0.1" 
-MQTT_PORT = 1883
+# Dapat diganti lewat environment variable (misal oleh rig simulasi motion_storm.py)
+INVESTIGATION_FOLDER = os.environ.get("INVESTIGATION_FOLDER", "/mnt/d/xampp-8.1/htdocs/sensor-motion/foto-investigation/")
+MQTT_BROKER = os.environ.get("MQTT_BROKER", "127.0.0.1")
+MQTT_PORT = int(os.environ.get("MQTT_PORT", "1883"))
 MQTT_TIMEOUT = 60
+# Jika True, frame berurutan dari kamera yang sama digabung menjadi satu event session
+# (hanya keyframe yang disimpan ke disk/history). Jika False, setiap frame disimpan seperti semula.
+EVENT_SESSION_ENABLED = True
 # -------------------
 
-# Membuat folder untuk penyimpanan gambar jika belum ada
-os.makedirs(INVESTIGATION_FOLDER, exist_ok=True) 
+# Memastikan skema database terbaru (idempoten): menambah kolom/tabel baru pada
+# database lama sehingga INSERT history tidak gagal setelah upgrade.
+# Sample data hanya disisipkan oleh 'python database_setup.py'.
+migrate_database()
 
 # --- FUNGSI BANTU DATABASE ---
 
-def insert_history(filepath, detected, person_count):
-    """Menyisipkan catatan deteksi baru ke tabel 'history'."""
+def insert_history(filepath, detected, person_count, camera_id=DEFAULT_CAMERA_ID,
+                   timestamp=None, event_id=None, rollup=True):
+    """
+    Menyisipkan catatan deteksi baru ke tabel 'history' dan memperbarui
+    tabel 'history_rollup' dalam transaksi yang sama.
+    rollup=False dipakai untuk keyframe event session yang frame-nya sudah dihitung di rollup.
+    """
     try:
         conn = get_db_connection()
+        current_time = (timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
         conn.execute(
-            "INSERT INTO history (datetime, capture_image, detection_status, person_count) VALUES (?, ?, ?, ?)",
+            "INSERT INTO history (datetime, capture_image, detection_status, person_count, camera_id, event_id) VALUES (?, ?, ?, ?, ?, ?)",
             (
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                current_time,
                 os.path.basename(filepath), # Hanya menyimpan nama file
                 "Detected" if detected else "Not Detected",
-                person_count
+                person_count,
+                camera_id,
+                event_id
             )
         )
+        if rollup:
+            apply_rollup(conn, camera_id, current_time, detected, person_count)
         conn.commit()
         conn.close()
         print(f"✅ Data history disimpan: Status={detected}, Count={person_count}, File={os.path.basename(filepath)}")
@@ -52,6 +71,17 @@ def insert_history(filepath, detected, person_count):
         print(f"❌ Gagal menyisipkan data history: {e}")
 
 
+def update_history_rollup(camera_id, timestamp, detected, person_count):
+    """Memperbarui 'history_rollup' untuk frame yang tidak disimpan ke tabel 'history'."""
+    try:
+        conn = get_db_connection()
+        apply_rollup(conn, camera_id, timestamp.strftime('%Y-%m-%d %H:%M:%S'), detected, person_count)
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"❌ Gagal memperbarui rollup history: {e}")
+
+
 def update_lamp_status_db(new_status):
     """Memperbarui status lampu terakhir di tabel 'status_lamp'."""
     try:
@@ -151,15 +181,17 @@ def analyze_human_detection(image_data):
         print(f"Error during HOG analysis: {e}")
         return False, []
 
-def save_investigation_image(image_bytes, detected):
+def save_investigation_image(image_bytes, detected, timestamp=None):
     """Menyimpan byte gambar ke disk dengan nama unik."""
     unique_id = uuid.uuid4().hex[:6] # Ambil 6 karakter pertama
     prefix = "DETECTED_" if detected else ""
     # Menggunakan datetime dari modul datetime
-    filename = f"{prefix}{datetime.now().strftime('%Y%m%d%H%M%S')}_{unique_id}.jpg"
+    filename = f"{prefix}{(timestamp or datetime.now()).strftime('%Y%m%d%H%M%S')}_{unique_id}.jpg"
     filepath = os.path.join(INVESTIGATION_FOLDER, filename)
     
     try:
+        # Membuat folder untuk penyimpanan gambar jika belum ada
+        os.makedirs(INVESTIGATION_FOLDER, exist_ok=True)
         with open(filepath, 'wb') as f:
             f.write(image_bytes)
         return filepath
@@ -167,6 +199,201 @@ def save_investigation_image(image_bytes, detected):
         print(f"Gagal menyimpan file: {e}")
         return None
 
+# --- FUNGSI BANTU EVENT SESSION ---
+
+session_manager = EventSessionManager()
+
+def history_payload_size(timestamp, filename, detected, person_count, camera_id, event_id=None):
+    """Perkiraan ukuran (byte) satu baris history di response JSON /history."""
+    return len(json.dumps({
+        "id": 0,
+        "datetime": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        "capture_image": filename,
+        "detection_status": "Detected" if detected else "Not Detected",
+        "person_count": person_count,
+        "camera_id": camera_id,
+        "event_id": event_id
+    }))
+
+def example_investigation_filename(detected):
+    """Contoh nama file (panjang sama) yang akan dihasilkan save_investigation_image()."""
+    prefix = "DETECTED_" if detected else ""
+    return f"{prefix}{'0' * 14}_{'0' * 6}.jpg"
+
+def save_keyframe(session, frame, rollup):
+    """Menyimpan satu keyframe sesi ke disk dan ke tabel 'history'."""
+    filepath = save_investigation_image(frame.image_bytes, frame.detected, frame.timestamp)
+    if not filepath:
+        return None
+    frame.saved = True
+    filename = os.path.basename(filepath)
+    insert_history(filepath, frame.detected, frame.person_count, session.camera_id,
+                   timestamp=frame.timestamp, event_id=session.db_id, rollup=rollup)
+    session.keyframes.append(filename)
+    session_manager.add_savings(
+        db_rows_actual=1,
+        disk_bytes_actual=len(frame.image_bytes),
+        history_payload_bytes_actual=history_payload_size(
+            frame.timestamp, filename, frame.detected, frame.person_count, session.camera_id, session.db_id
+        )
+    )
+    return filepath
+
+def insert_event_session(session):
+    """
+    Mencatat sesi baru ke tabel 'event_session'.
+    Dipanggil oleh EventSessionManager.observe() sebelum sesi terlihat oleh request lain.
+    """
+    try:
+        conn = get_db_connection()
+        start_text = session.start.strftime('%Y-%m-%d %H:%M:%S')
+        cursor = conn.execute(
+            "INSERT INTO event_session (camera_id, start_datetime, end_datetime, frame_count, detection_count, peak_person_count) VALUES (?, ?, ?, ?, ?, ?)",
+            (session.camera_id, start_text, start_text, session.frame_count, session.detection_count, session.peak_person_count)
+        )
+        conn.commit()
+        session.db_id = cursor.lastrowid
+        conn.close()
+        session_manager.add_savings(db_rows_actual=1)
+        print(f"✅ Event session #{session.db_id} dibuka untuk kamera '{session.camera_id}'")
+    except Exception as e:
+        print(f"❌ Gagal membuat event session: {e}")
+
+def sync_event_session(data):
+    """Menulis statistik terbaru sesi (hasil EventSession.to_dict()) ke tabel 'event_session'."""
+    if data["id"] is None:
+        return
+    try:
+        conn = get_db_connection()
+        conn.execute(
+            "UPDATE event_session SET end_datetime = ?, frame_count = ?, detection_count = ?, peak_person_count = ?, keyframes = ?, status = ? WHERE id = ?",
+            (
+                data["end_datetime"],
+                data["frame_count"],
+                data["detection_count"],
+                data["peak_person_count"],
+                json.dumps(data["keyframes"]),
+                data["status"],
+                data["id"]
+            )
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"❌ Gagal memperbarui event session #{data['id']}: {e}")
+
+def close_event_session(session):
+    """Menyimpan frame positif terakhir sebagai keyframe dan menutup sesi di tabel 'event_session'."""
+    if not session.last_detected_frame.saved:
+        save_keyframe(session, session.last_detected_frame, rollup=False)
+    # Buffer frame antara tidak disimpan permanen
+    session.buffer.clear()
+    sync_event_session(session.to_dict(status="closed"))
+    print(f"✅ Event session #{session.db_id} ditutup: {session.frame_count} frame, puncak {session.peak_person_count} orang")
+
+def abandon_open_event_sessions():
+    """
+    Menandai sesi yang masih 'open' di DB sebagai 'abandoned' saat aplikasi mulai.
+    Sesi tersebut tertinggal dari proses sebelumnya yang berhenti tanpa menutup sesi;
+    statistiknya adalah sinkronisasi terakhir sebelum proses berhenti.
+    """
+    try:
+        conn = get_db_connection()
+        cursor = conn.execute("UPDATE event_session SET status = 'abandoned' WHERE status = 'open'")
+        conn.commit()
+        conn.close()
+        if cursor.rowcount:
+            print(f"Event session tertinggal ditandai 'abandoned': {cursor.rowcount}")
+    except Exception as e:
+        print(f"❌ Gagal membersihkan event session tertinggal: {e}")
+
+def record_detection_frame(image_bytes, detected, person_count, camera_id):
+    """
+    Menyimpan hasil analisis satu frame.
+    Mengembalikan (filepath, event_id, write_lamp_status):
+    - filepath: file gambar yang disimpan, atau None jika frame hanya ditahan di buffer sesi
+    - event_id: id event session yang menampung frame (None jika tidak ada)
+    - write_lamp_status: apakah status lampu 'on' perlu dicatat ke tabel 'status_lamp'
+    """
+    if not EVENT_SESSION_ENABLED:
+        filepath = save_investigation_image(image_bytes, detected)
+        if filepath:
+            insert_history(filepath, detected, person_count, camera_id)
+        return filepath, None, detected
+
+    frame = Frame(datetime.now(), image_bytes, detected, person_count)
+    session, is_new, expired_session = session_manager.observe(camera_id, frame, on_open=insert_event_session)
+    if expired_session:
+        close_event_session(expired_session)
+
+    # Baseline: mode lama menyimpan setiap frame. Baris status_lamp baseline dihitung
+    # di settle_lamp_claim() karena hanya ditulis jika publish MQTT berhasil.
+    session_manager.add_savings(
+        frames=1,
+        db_rows_baseline=1,
+        disk_bytes_baseline=len(image_bytes),
+        history_payload_bytes_baseline=history_payload_size(
+            frame.timestamp, example_investigation_filename(detected), detected, person_count, camera_id
+        )
+    )
+
+    if session is None:
+        # Frame negatif di luar sesi: disimpan seperti biasa
+        filepath = save_investigation_image(image_bytes, detected, frame.timestamp)
+        if filepath:
+            insert_history(filepath, detected, person_count, camera_id, timestamp=frame.timestamp)
+            session_manager.add_savings(
+                db_rows_actual=1,
+                disk_bytes_actual=len(image_bytes),
+                history_payload_bytes_actual=history_payload_size(
+                    frame.timestamp, os.path.basename(filepath), detected, person_count, camera_id
+                )
+            )
+        return filepath, None, False
+
+    if frame.is_new_peak:
+        # Frame pertama dan setiap puncak baru langsung disimpan agar tidak hilang jika proses berhenti
+        filepath = save_keyframe(session, frame, rollup=True)
+        if not is_new:
+            sync_event_session(session.to_dict())
+    else:
+        # Frame antara: hanya ditahan di buffer, tetapi tetap dihitung di rollup
+        filepath = None
+        update_history_rollup(camera_id, frame.timestamp, detected, person_count)
+
+    return filepath, session.db_id, frame.claims_lamp
+
+def settle_lamp_claim(event_id, write_lamp_status, published, lamp_written):
+    """
+    Dipanggil endpoint deteksi setelah publish lampu 'on' untuk frame positif.
+    Menghitung baris status_lamp (baseline: setiap publish berhasil; aktual: hanya yang
+    benar-benar ditulis), dan mengembalikan klaim sesi jika baris gagal ditulis.
+    """
+    if not EVENT_SESSION_ENABLED:
+        return
+    if published:
+        session_manager.add_savings(db_rows_baseline=1)
+    if lamp_written:
+        session_manager.add_savings(db_rows_actual=1)
+    elif write_lamp_status and event_id is not None:
+        session_manager.release_lamp_claim(event_id)
+
+def event_session_sweeper():
+    """
+    Thread latar belakang: menutup sesi yang sudah kedaluwarsa dan menyinkronkan
+    statistik sesi yang masih terbuka ke DB agar tidak hilang jika proses berhenti.
+    """
+    while True:
+        time.sleep(SESSION_SWEEP_INTERVAL)
+        for session in session_manager.pop_expired(datetime.now()):
+            close_event_session(session)
+        for data in session_manager.open_sessions():
+            sync_event_session(data)
+
+if EVENT_SESSION_ENABLED:
+    abandon_open_event_sessions()
+    threading.Thread(target=event_session_sweeper, daemon=True).start()
+
 # ==================================================================
 # ENDPOINT PUBLIC (FOTO INVESTIGASI) 🖼️
 # ==================================================================
@@ -224,7 +451,7 @@ def get_history():
         conn = get_db_connection()
         # Mengambil kolom capture_image
         history = conn.execute(
-            "SELECT id, datetime, capture_image, detection_status, person_count FROM history ORDER BY datetime DESC"
+            "SELECT id, datetime, capture_image, detection_status, person_count, camera_id, event_id FROM history ORDER BY datetime DESC"
         ).fetchall()
         conn.close()
         
@@ -239,6 +466,121 @@ def get_history():
     except Exception as e:
         return jsonify({"status": "error", "message": f"Gagal mengambil data history: {str(e)}"}), 500
 
+# ==================================================================
+# ENDPOINT STATISTIK (ROLLUP) 📈
+# ==================================================================
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """
+    Mengambil statistik deteksi dari tabel 'history_rollup'.
+    Query params: granularity (minute|hour|day, default hour),
+    start & end (format 'YYYY-MM-DD HH:MM:SS', rentang [start, end); semua bucket yang beririsan
+    dikembalikan), camera_id (opsional).
+    """
+    granularity = request.args.get('granularity', 'hour')
+    start = request.args.get('start')
+    end = request.args.get('end')
+    camera_id = request.args.get('camera_id')
+
+    if granularity not in ROLLUP_GRANULARITIES:
+        return jsonify({
+            "status": "error",
+            "message": f"Parameter 'granularity' tidak valid. Gunakan salah satu dari: {', '.join(ROLLUP_GRANULARITIES)}."
+        }), 400
+
+    # Format ulang agar selalu zero-padded: strptime menerima '9:00:00', sedangkan
+    # bucket_for() dan perbandingan bucket bergantung pada posisi karakter.
+    normalized = {}
+    for name, value in (('start', start), ('end', end)):
+        if value:
+            try:
+                value = datetime.strptime(value, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                return jsonify({
+                    "status": "error",
+                    "message": f"Parameter '{name}' harus berformat 'YYYY-MM-DD HH:MM:SS'."
+                }), 400
+        normalized[name] = value
+    start, end = normalized['start'], normalized['end']
+
+    if start and end and start >= end:
+        return jsonify({
+            "status": "error",
+            "message": "Parameter 'start' harus lebih awal dari 'end'."
+        }), 400
+
+    try:
+        conn = get_db_connection()
+        rows = query_rollups(conn, granularity, start, end, camera_id)
+        conn.close()
+
+        stats_list = [dict(row) for row in rows]
+
+        return jsonify({
+            "status": "success",
+            "granularity": granularity,
+            "start": start,
+            "end": end,
+            "camera_id": camera_id,
+            "count": len(stats_list),
+            "data": stats_list
+        }), 200
+
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"Gagal mengambil data statistik: {str(e)}"}), 500
+
+# ==================================================================
+# ENDPOINT EVENT SESSION 🎞️
+# ==================================================================
+@app.route('/events', methods=['GET'])
+def get_events():
+    """Mengambil daftar event session (satu baris per kejadian), terbaru lebih dulu."""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT id, camera_id, start_datetime, end_datetime, frame_count, detection_count, peak_person_count, keyframes, status FROM event_session ORDER BY start_datetime DESC"
+        ).fetchall()
+        conn.close()
+
+        # Sesi yang masih terbuka diambil dari memori karena statistiknya belum ditulis ke DB
+        open_sessions = {s["id"]: s for s in session_manager.open_sessions()}
+        events_list = []
+        for row in rows:
+            event = dict(row)
+            event["keyframes"] = json.loads(event["keyframes"])
+            events_list.append(open_sessions.get(event["id"], event))
+
+        return jsonify({
+            "status": "success",
+            "count": len(events_list),
+            "data": events_list
+        }), 200
+
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"Gagal mengambil data event session: {str(e)}"}), 500
+
+
+@app.route('/events/<int:event_id>/preview', methods=['GET'])
+def get_event_preview(event_id):
+    """Menyajikan frame terbaru dari buffer memori sebuah event session yang masih terbuka."""
+    image_bytes = session_manager.latest_frame(event_id)
+    if image_bytes is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Event session #{event_id} tidak sedang terbuka."
+        }), 404
+    return Response(image_bytes, mimetype='image/jpeg')
+
+
+@app.route('/events/savings', methods=['GET'])
+def get_event_savings():
+    """Mengukur pengurangan baris DB, byte disk, dan ukuran payload /history sejak aplikasi berjalan."""
+    return jsonify({
+        "status": "success",
+        "event_session_enabled": EVENT_SESSION_ENABLED,
+        "data": session_manager.savings_report()
+    }), 200
+
 # ==================================================================
 # ENDPOINT 2: PUBLISH CUSTOM KE MQTT 🚀 (TIDAK DIHAPUS)
 # ==================================================================
@@ -320,6 +662,8 @@ def turn_off_lamp():
     if success:
         new_db_status = PAYLOAD_DICT["status"].lower() 
         update_success = update_lamp_status_db(new_db_status)
+        # Deteksi berikutnya dalam sesi yang sama akan mencatat status 'on' lagi
+        session_manager.mark_lamp_off()
 
         response_message = "Perintah 'Turn Off Lamp' berhasil dikirim via MQTT."
         if not update_success:
@@ -349,6 +693,7 @@ def detect_from_upload():
         return jsonify({"status": "error", "message": "No file part"}), 400
 
     file = request.files['file']
+    camera_id = request.form.get('camera_id') or DEFAULT_CAMERA_ID
     if file.filename == '':
         return jsonify({"status": "error", "message": "No selected file"}), 400
 
@@ -363,7 +708,7 @@ def detect_from_upload():
         detected, results = analyze_human_detection(img_np)
         person_count = len(results)
         
-        filepath = save_investigation_image(image_stream, detected)
+        filepath, event_id, write_lamp_status = record_detection_frame(image_stream, detected, person_count, camera_id)
         
         # Kirim perintah ON jika terdeteksi
         if detected:
@@ -372,13 +717,12 @@ def detect_from_upload():
             PAYLOAD_JSON_ON = json.dumps(PAYLOAD_DICT_ON) 
             
             publish_success, error_msg = publish_to_mqtt(LAMP_TOPIC, PAYLOAD_JSON_ON)
-            if publish_success:
-                 update_lamp_status_db(PAYLOAD_DICT_ON["status"])
+            lamp_written = False
+            if publish_success and write_lamp_status:
+                 lamp_written = update_lamp_status_db(PAYLOAD_DICT_ON["status"])
+            settle_lamp_claim(event_id, write_lamp_status, publish_success, lamp_written)
             
             print(f"!!! HUMAN DETECTED: Memicu Lampu ON. Jumlah Orang: {person_count}")
-        
-        if filepath:
-            insert_history(filepath, detected, person_count)
 
 
         response_data = {
@@ -386,7 +730,8 @@ def detect_from_upload():
             "human_detected": detected,
             "person_count": person_count,
             "detections": results,
-            "image_filename": os.path.basename(filepath) if filepath else None
+            "image_filename": os.path.basename(filepath) if filepath else None,
+            "event_id": event_id
         }
         
         if detected:
@@ -411,6 +756,7 @@ def detect_from_url():
     
     data = request.get_json()
     image_url = data.get('image_url')
+    camera_id = data.get('camera_id') or DEFAULT_CAMERA_ID
 
     if not image_url:
         return jsonify({
@@ -449,27 +795,27 @@ def detect_from_url():
         # Tetap lanjutkan untuk menyimpan gambar (jika ada) meskipun analisis gagal
         detected, person_count = False, 0 
 
-    # 3. Simpan Gambar Investigasi ke Disk
-    filepath = save_investigation_image(image_bytes, detected)
-    
-    # 4. Simpan Hasil Deteksi ke History DB
-    if filepath:
-        insert_history(filepath, detected, person_count)
+    # 3 & 4. Simpan Gambar Investigasi ke Disk dan Hasil Deteksi ke History DB
+    # (dengan event session, frame antara hanya ditahan di buffer)
+    filepath, event_id, write_lamp_status = record_detection_frame(image_bytes, detected, person_count, camera_id)
 
     # 5. Kontrol Lampu via MQTT jika terdeteksi
     mqtt_message = "No lamp command sent."
     if detected:
         print(f"!!! HUMAN DETECTED: Memicu Lampu ON. Jumlah Orang: {person_count}")
         success, error_msg = publish_to_mqtt(LAMP_TOPIC, PAYLOAD_JSON_ON)
+        lamp_written = False
         
         if success:
-            # Perbarui status lampu di DB ke 'on'
-            update_lamp_status_db(PAYLOAD_DICT_ON["status"])
+            # Perbarui status lampu di DB ke 'on' (sekali per event session)
+            if write_lamp_status:
+                lamp_written = update_lamp_status_db(PAYLOAD_DICT_ON["status"])
             mqtt_message = "Lamp ON command successfully sent."
         else:
             print(f"❌ Gagal mengirim perintah MQTT ON: {error_msg}")
             mqtt_message = f"Lamp ON command failed to send: {error_msg}"
-            
+        settle_lamp_claim(event_id, write_lamp_status, success, lamp_written)
+
         message = f"Human detected. Total {person_count} person(s) found. {mqtt_message}"
     else:
         message = "No human detected."
@@ -483,6 +829,7 @@ def detect_from_url():
         "person_count": person_count,
         "detections": results if 'results' in locals() else [],
         "image_filename": os.path.basename(filepath) if filepath else None,
+        "event_id": event_id,
         "mqtt_status": mqtt_message
     }), 200
 
@@ -496,6 +843,9 @@ if __name__ == '__main__':
         # Perluas host ke '0.0.0.0' agar dapat diakses dari jaringan luar
         app.run(host='0.0.0.0', port=5000, debug=True)
     finally:
+        # Tutup semua event session yang masih terbuka agar keyframe tersimpan
+        for session in session_manager.pop_all():
+            close_event_session(session)
         mqtt_client.loop_stop()
         mqtt_client.disconnect()
         print("Koneksi MQTT terputus.")
\ No newline at end of file
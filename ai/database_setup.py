@@ -13,15 +13,13 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row 
     return conn
 
-def initialize_database():
+def migrate_database():
     """
-    Membuat tabel 'history' dan 'status_lamp' jika belum ada, 
-    dan menyisipkan sample data untuk keduanya.
+    Membuat/memperbarui skema (tabel, kolom baru, rollup) secara idempoten tanpa sample data.
+    Aman dipanggil setiap kali app.py mulai.
     """
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    print(f"Menginisialisasi database: {DATABASE_NAME}")
 
     # 1. Membuat tabel history
     cursor.execute("""
@@ -30,9 +28,19 @@ def initialize_database():
             datetime TEXT NOT NULL,
             capture_image TEXT NOT NULL,
             detection_status TEXT NOT NULL,
-            person_count INTEGER
+            person_count INTEGER,
+            camera_id TEXT NOT NULL DEFAULT 'default',
+            event_id INTEGER
         );
     """)
+    # Migrasi: database lama belum memiliki kolom camera_id
+    history_columns = [row["name"] for row in cursor.execute("PRAGMA table_info(history)")]
+    if "camera_id" not in history_columns:
+        cursor.execute("ALTER TABLE history ADD COLUMN camera_id TEXT NOT NULL DEFAULT 'default'")
+        print("Kolom 'camera_id' ditambahkan ke tabel 'history'.")
+    if "event_id" not in history_columns:
+        cursor.execute("ALTER TABLE history ADD COLUMN event_id INTEGER")
+        print("Kolom 'event_id' ditambahkan ke tabel 'history'.")
     print("Tabel 'history' diperiksa/dibuat.")
 
     # 2. Membuat tabel status_lamp (Baru ditambahkan)
@@ -45,6 +53,69 @@ def initialize_database():
     """)
     print("Tabel 'status_lamp' diperiksa/dibuat.")
 
+    # 3. Membuat tabel history_rollup (agregasi per kamera per menit/jam/hari)
+    # Diperbarui secara inkremental oleh insert_history() di app.py.
+    # Urutan primary key (granularity, bucket, camera_id) agar range query /stats
+    # untuk semua kamera tetap memakai index, bukan full scan.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS history_rollup (
+            camera_id TEXT NOT NULL,
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            frame_count INTEGER NOT NULL DEFAULT 0,
+            detection_count INTEGER NOT NULL DEFAULT 0,
+            person_count_sum INTEGER NOT NULL DEFAULT 0,
+            person_count_max INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket, camera_id)
+        ) WITHOUT ROWID;
+    """)
+    print("Tabel 'history_rollup' diperiksa/dibuat.")
+
+    # 4. Membuat tabel event_session (satu baris per kejadian, bukan per frame)
+    # Keyframe disimpan sebagai JSON list nama file
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_session (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            camera_id TEXT NOT NULL,
+            start_datetime TEXT NOT NULL,
+            end_datetime TEXT NOT NULL,
+            frame_count INTEGER NOT NULL DEFAULT 0,
+            detection_count INTEGER NOT NULL DEFAULT 0,
+            peak_person_count INTEGER NOT NULL DEFAULT 0,
+            keyframes TEXT NOT NULL DEFAULT '[]',
+            status TEXT NOT NULL DEFAULT 'open'
+        );
+    """)
+    print("Tabel 'event_session' diperiksa/dibuat.")
+
+    conn.commit()
+    conn.close()
+
+    backfill_rollups_if_empty()
+
+def backfill_rollups_if_empty():
+    """Membangun 'history_rollup' dari 'history' jika rollup masih kosong (misal database lama)."""
+    conn = get_db_connection()
+    rollup_empty = conn.execute("SELECT COUNT(*) FROM history_rollup").fetchone()[0] == 0
+    history_exists = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] > 0
+    conn.close()
+
+    if rollup_empty and history_exists:
+        print("Tabel 'history_rollup' kosong. Menjalankan backfill dari tabel 'history'...")
+        from rollup import backfill_rollups
+        backfill_rollups()
+
+def initialize_database():
+    """
+    Membuat tabel 'history' dan 'status_lamp' jika belum ada, 
+    dan menyisipkan sample data untuk keduanya.
+    """
+    print(f"Menginisialisasi database: {DATABASE_NAME}")
+    migrate_database()
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
     # --- INISIALISASI DATA HISTORY ---
     cursor.execute("SELECT COUNT(*) FROM history")
     if cursor.fetchone()[0] == 0:
@@ -83,5 +154,8 @@ def initialize_database():
     conn.commit()
     conn.close()
 
+    # Sample data history juga dimasukkan ke rollup
+    backfill_rollups_if_empty()
+
 if __name__ == '__main__':
     initialize_database()
\ No newline at end of file
@@ -0,0 +1,204 @@
+# event_session.py
+
+import threading
+from collections import deque
+
+# --- Konfigurasi Event Session ---
+SESSION_GAP_SECONDS = 30     # Sesi ditutup jika tidak ada deteksi positif selama N detik
+SESSION_BUFFER_SIZE = 5      # Jumlah frame terbaru yang ditahan di memori per sesi (untuk preview)
+SESSION_SWEEP_INTERVAL = 5   # Interval (detik) sinkronisasi sesi terbuka ke DB & penutupan sesi kedaluwarsa
+# ---------------------------------
+
+
+class Frame:
+    """Satu frame hasil analisis HOG yang belum tentu disimpan ke disk."""
+
+    def __init__(self, timestamp, image_bytes, detected, person_count):
+        self.timestamp = timestamp
+        self.image_bytes = image_bytes
+        self.detected = detected
+        self.person_count = person_count or 0
+        self.is_new_peak = False     # Diisi oleh EventSession: frame ini puncak baru -> simpan segera
+        self.claims_lamp = False     # Diisi oleh EventSession: frame ini mencatat status lampu 'on'
+        self.saved = False           # Sudah disimpan sebagai keyframe
+
+
+class EventSession:
+    """
+    Satu kejadian (occupancy episode) dari satu kamera: rangkaian frame berurutan
+    sejak deteksi manusia pertama sampai tidak ada deteksi selama SESSION_GAP_SECONDS.
+    Frame pertama dan setiap puncak jumlah orang baru langsung disimpan permanen,
+    frame positif terakhir disimpan saat sesi ditutup. Frame lain (termasuk frame negatif
+    di akhir sesi) hanya ditahan di buffer memori.
+    """
+
+    def __init__(self, camera_id, frame, buffer_size=SESSION_BUFFER_SIZE):
+        self.db_id = None
+        self.camera_id = camera_id
+        self.start = frame.timestamp
+        self.end = frame.timestamp
+        self.last_detected_at = frame.timestamp
+        self.frame_count = 1
+        self.detection_count = 1
+        self.peak_person_count = frame.person_count
+        self.first_frame = frame
+        self.last_detected_frame = frame
+        self.keyframes = []  # Nama file keyframe yang sudah disimpan ke disk
+        self.buffer = deque([frame], maxlen=buffer_size)
+        self.lamp_on = True
+        frame.is_new_peak = True
+        frame.claims_lamp = True
+
+    @property
+    def last_frame(self):
+        return self.buffer[-1]
+
+    def add(self, frame):
+        """Menambahkan frame ke sesi dan memperbarui statistik sesi."""
+        self.frame_count += 1
+        self.end = frame.timestamp
+        self.buffer.append(frame)
+        if frame.detected:
+            self.detection_count += 1
+            self.last_detected_at = frame.timestamp
+            self.last_detected_frame = frame
+            if frame.person_count > self.peak_person_count:
+                self.peak_person_count = frame.person_count
+                frame.is_new_peak = True
+            if not self.lamp_on:
+                # Lampu dimatikan manual selama sesi: catat 'on' lagi, sekali saja
+                self.lamp_on = True
+                frame.claims_lamp = True
+
+    def is_expired(self, now, gap_seconds=SESSION_GAP_SECONDS):
+        """Sesi kedaluwarsa jika deteksi positif terakhir lebih lama dari gap_seconds."""
+        return (now - self.last_detected_at).total_seconds() > gap_seconds
+
+    def to_dict(self, status="open"):
+        """Representasi sesi untuk response JSON dan sinkronisasi ke tabel 'event_session'."""
+        return {
+            "id": self.db_id,
+            "camera_id": self.camera_id,
+            "start_datetime": self.start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": self.end.strftime('%Y-%m-%d %H:%M:%S'),
+            "frame_count": self.frame_count,
+            "detection_count": self.detection_count,
+            "peak_person_count": self.peak_person_count,
+            "keyframes": list(self.keyframes),
+            "status": status
+        }
+
+
+class EventSessionManager:
+    """
+    Menyimpan sesi yang sedang terbuka per kamera (di memori) dan
+    menghitung penghematan tulis dibanding mode satu-baris-per-frame.
+    """
+
+    def __init__(self, gap_seconds=SESSION_GAP_SECONDS, buffer_size=SESSION_BUFFER_SIZE):
+        self.gap_seconds = gap_seconds
+        self.buffer_size = buffer_size
+        self._sessions = {}
+        # RLock: callback on_open dijalankan di dalam lock dan boleh memanggil add_savings()
+        self._lock = threading.RLock()
+        self._savings = {
+            "frames": 0,
+            "db_rows_baseline": 0,
+            "db_rows_actual": 0,
+            "disk_bytes_baseline": 0,
+            "disk_bytes_actual": 0,
+            "history_payload_bytes_baseline": 0,
+            "history_payload_bytes_actual": 0,
+        }
+
+    def observe(self, camera_id, frame, on_open=None):
+        """
+        Memasukkan frame baru untuk kamera tertentu.
+        on_open(session) dipanggil sebelum sesi baru terlihat oleh request lain,
+        sehingga id sesi dari database sudah terisi untuk frame berikutnya.
+        Mengembalikan (session, is_new, expired_session):
+        - session: sesi yang menampung frame, atau None jika frame tidak termasuk sesi
+          (frame negatif tanpa sesi terbuka, diproses seperti biasa oleh pemanggil)
+        - is_new: True jika frame ini membuka sesi baru
+        - expired_session: sesi lama kamera ini yang harus ditutup oleh pemanggil, atau None
+        """
+        with self._lock:
+            expired_session = None
+            session = self._sessions.get(camera_id)
+            if session and session.is_expired(frame.timestamp, self.gap_seconds):
+                expired_session = self._sessions.pop(camera_id)
+                session = None
+
+            if session:
+                session.add(frame)
+                return session, False, expired_session
+
+            if not frame.detected:
+                return None, False, expired_session
+
+            session = EventSession(camera_id, frame, self.buffer_size)
+            if on_open:
+                on_open(session)
+            self._sessions[camera_id] = session
+            return session, True, expired_session
+
+    def pop_expired(self, now):
+        """Mengeluarkan semua sesi yang sudah kedaluwarsa agar ditutup oleh pemanggil."""
+        with self._lock:
+            expired = [cam for cam, s in self._sessions.items() if s.is_expired(now, self.gap_seconds)]
+            return [self._sessions.pop(cam) for cam in expired]
+
+    def pop_all(self):
+        """Mengeluarkan semua sesi terbuka (dipakai saat aplikasi berhenti)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            return sessions
+
+    def open_sessions(self):
+        """Snapshot sesi yang sedang terbuka dalam bentuk dict."""
+        with self._lock:
+            return [s.to_dict() for s in self._sessions.values()]
+
+    def latest_frame(self, event_id):
+        """Byte gambar frame terbaru di buffer sesi terbuka dengan id tertentu (None jika tidak ada)."""
+        with self._lock:
+            for session in self._sessions.values():
+                if session.db_id == event_id:
+                    return session.last_frame.image_bytes
+        return None
+
+    def release_lamp_claim(self, event_id):
+        """
+        Mengembalikan klaim status lampu jika baris 'on' gagal ditulis (publish MQTT / DB gagal),
+        agar frame positif berikutnya dalam sesi yang sama mencoba lagi.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                if session.db_id == event_id:
+                    session.lamp_on = False
+
+    def mark_lamp_off(self):
+        """Dipanggil saat lampu dimatikan manual, agar deteksi berikutnya mencatat 'on' lagi."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.lamp_on = False
+
+    def add_savings(self, **deltas):
+        """Menambahkan counter penghematan, misal add_savings(db_rows_actual=1)."""
+        with self._lock:
+            for key, value in deltas.items():
+                self._savings[key] += value
+
+    def savings_report(self):
+        """Ringkasan penghematan baris DB, byte disk, dan ukuran payload /history."""
+        with self._lock:
+            report = dict(self._savings)
+
+        for metric in ("db_rows", "disk_bytes", "history_payload_bytes"):
+            baseline = report[f"{metric}_baseline"]
+            actual = report[f"{metric}_actual"]
+            report[f"{metric}_reduction_percent"] = (
+                round((baseline - actual) * 100.0 / baseline, 2) if baseline else 0.0
+            )
+        return report
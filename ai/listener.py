@@ -11,6 +11,7 @@ MQTT_TOPIC = "sensor/motion" # Topik yang mengirim status pergerakan
 # --- Konfigurasi API Kamera ---
 # GANTI INI: Asumsi bahwa ada endpoint API di kamera yang mengembalikan gambar terbaru
 CAMERA_IMAGE_API_URL = "http://192.168.100.71/capture"  # Ganti dengan URL API kamera Anda
+CAMERA_ID = "default"  # Identitas kamera, dipakai untuk rollup statistik per kamera (/stats)
 
 # --- Konfigurasi API Flask ---
 # app.py Anda memiliki endpoint /detect/url, tapi kita ubah ke /detect/upload 
@@ -85,6 +86,7 @@ def capture_and_send_to_detector():
         response_flask = requests.post(
             FLASK_DETECT_URL, 
             files=files,
+            data={'camera_id': CAMERA_ID},
             timeout=30 # Waktu tunggu lebih lama untuk proses deteksi
         )
         
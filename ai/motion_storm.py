@@ -0,0 +1,722 @@
+# motion_storm.py
+#
+# Rig simulasi end-to-end tanpa perangkat keras:
+#   PIR (simulasi) --sensor/motion--> listener.on_message --GET /capture--> kamera ESP32 (palsu)
+#   --POST /detect/upload--> app.py --lamp--> subscriber lampu (mencatat waktu terima)
+#
+# Semua komponen berjalan di satu proses: broker MQTT minimal, server kamera HTTP
+# yang menyajikan gambar dari folder sample-foto/, aplikasi Flask (app.py) dan listener.py asli.
+# Database dan foto investigasi ditulis ke folder sementara.
+#
+# Contoh:
+#   python motion_storm.py --sensors 5 --rate 1 --duration 20
+#
+# Sebagai tes otomatis (exit code 1 jika batas terlampaui):
+#   python motion_storm.py --sensors 2 --rate 0.5 --duration 10 --seed 1 --max-drop-rate 0 --max-p95-ms 5000
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import queue
+import random
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import paho.mqtt.client as mqtt
+
+# --- Konfigurasi Default ---
+HOST = "127.0.0.1"
+MOTION_TOPIC = "sensor/motion"
+LAMP_TOPIC = "lamp"
+SAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample-foto")
+# Penanda indeks capture yang ditempel di akhir JPEG (decoder mengabaikan data setelah marker EOI),
+# agar setiap publish lampu dari /detect/upload dapat ditelusuri ke capture asalnya
+CAPTURE_TRAILER = b"\nSTORM-CAPTURE:"
+# ---------------------------
+
+
+# ==================================================================
+# BROKER MQTT MINIMAL (MQTT 3.1.1, QoS 0/1)
+# ==================================================================
+# Pengganti broker (HiveMQ/Mosquitto) untuk simulasi lokal. Mendukung CONNECT, PUBLISH,
+# SUBSCRIBE/UNSUBSCRIBE, PINGREQ dan DISCONNECT. Pesan diteruskan ke subscriber dengan QoS 0,
+# tanpa retained message dan tanpa sesi persisten.
+
+def _encode_remaining_length(length):
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length > 0:
+            byte |= 0x80
+        encoded.append(byte)
+        if length == 0:
+            return bytes(encoded)
+
+
+def _topic_matches(topic_filter, topic):
+    """Mencocokkan topik dengan filter MQTT yang mengandung wildcard '+' dan '#'."""
+    filter_parts = topic_filter.split('/')
+    topic_parts = topic.split('/')
+    for i, part in enumerate(filter_parts):
+        if part == '#':
+            return True
+        if i >= len(topic_parts) or (part != '+' and part != topic_parts[i]):
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+class _BrokerConnection(socketserver.BaseRequestHandler):
+    """Satu koneksi klien MQTT. Pengiriman keluar dilakukan thread writer agar publisher tidak terblokir."""
+
+    def setup(self):
+        self.client_id = None
+        self.outbox = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def _write_loop(self):
+        while True:
+            packet = self.outbox.get()
+            if packet is None:
+                return
+            try:
+                self.request.sendall(packet)
+            except OSError:
+                return
+
+    def _read_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Koneksi ditutup oleh klien")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_packet(self):
+        header = self._read_exact(1)[0]
+        multiplier, length = 1, 0
+        while True:
+            byte = self._read_exact(1)[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        return header, self._read_exact(length) if length else b""
+
+    def send_packet(self, header, body=b""):
+        self.outbox.put(bytes([header]) + _encode_remaining_length(len(body)) + body)
+
+    def handle(self):
+        broker = self.server
+        try:
+            while True:
+                header, body = self._read_packet()
+                packet_type = header >> 4
+
+                if packet_type == 1:  # CONNECT
+                    proto_len = int.from_bytes(body[0:2], 'big')
+                    offset = 2 + proto_len + 4  # nama protokol, level, flags, keepalive
+                    id_len = int.from_bytes(body[offset:offset + 2], 'big')
+                    self.client_id = body[offset + 2:offset + 2 + id_len].decode()
+                    self.send_packet(0x20, b"\x00\x00")  # CONNACK: diterima
+
+                elif packet_type == 3:  # PUBLISH
+                    qos = (header >> 1) & 0x03
+                    topic_len = int.from_bytes(body[0:2], 'big')
+                    topic = body[2:2 + topic_len].decode()
+                    offset = 2 + topic_len
+                    if qos > 0:
+                        packet_id = body[offset:offset + 2]
+                        offset += 2
+                        self.send_packet(0x40 if qos == 1 else 0x50, packet_id)  # PUBACK / PUBREC
+                    broker.route(topic, body[offset:])
+
+                elif packet_type == 6:  # PUBREL (QoS 2)
+                    self.send_packet(0x70, body[0:2])  # PUBCOMP
+
+                elif packet_type == 8:  # SUBSCRIBE
+                    packet_id, offset, granted = body[0:2], 2, bytearray()
+                    while offset < len(body):
+                        filter_len = int.from_bytes(body[offset:offset + 2], 'big')
+                        topic_filter = body[offset + 2:offset + 2 + filter_len].decode()
+                        offset += 2 + filter_len + 1  # +1 byte QoS yang diminta
+                        broker.subscribe(self, topic_filter)
+                        granted.append(0)
+                    self.send_packet(0x90, packet_id + bytes(granted))  # SUBACK
+
+                elif packet_type == 10:  # UNSUBSCRIBE
+                    packet_id, offset = body[0:2], 2
+                    while offset < len(body):
+                        filter_len = int.from_bytes(body[offset:offset + 2], 'big')
+                        broker.unsubscribe(self, body[offset + 2:offset + 2 + filter_len].decode())
+                        offset += 2 + filter_len
+                    self.send_packet(0xB0, packet_id)  # UNSUBACK
+
+                elif packet_type == 12:  # PINGREQ
+                    self.send_packet(0xD0)  # PINGRESP
+
+                elif packet_type == 14:  # DISCONNECT
+                    return
+                # PUBACK/PUBREC/PUBCOMP dari klien diabaikan (pengiriman keluar selalu QoS 0)
+        except (ConnectionError, OSError):
+            return
+
+    def finish(self):
+        self.server.unsubscribe_all(self)
+        self.outbox.put(None)
+
+
+class LocalMqttBroker(socketserver.ThreadingTCPServer):
+    """Broker MQTT lokal. on_route(topic, payload, timestamp) dipanggil berurutan untuk setiap PUBLISH."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host=HOST, port=0, on_route=None):
+        super().__init__((host, port), _BrokerConnection)
+        self.on_route = on_route
+        self._subscriptions = []  # list (connection, topic_filter)
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def subscribe(self, connection, topic_filter):
+        with self._lock:
+            self._subscriptions.append((connection, topic_filter))
+
+    def unsubscribe(self, connection, topic_filter):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s != (connection, topic_filter)]
+
+    def unsubscribe_all(self, connection):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s[0] is not connection]
+
+    def route(self, topic, payload):
+        """Meneruskan pesan ke semua subscriber yang cocok, dengan urutan global yang konsisten."""
+        topic_bytes = topic.encode()
+        packet_body = len(topic_bytes).to_bytes(2, 'big') + topic_bytes + payload
+        with self._lock:
+            if self.on_route:
+                self.on_route(topic, payload, time.perf_counter())
+            for connection, topic_filter in self._subscriptions:
+                if _topic_matches(topic_filter, topic):
+                    connection.send_packet(0x30, packet_body)
+
+
+# ==================================================================
+# KAMERA ESP32 PALSU (/capture)
+# ==================================================================
+
+class FakeCameraServer(ThreadingHTTPServer):
+    """Menyajikan gambar sample secara bergiliran di /capture, seperti capture_handler di ESP32."""
+
+    daemon_threads = True
+
+    def __init__(self, images, recorder, failure_rate=0.0, delay=0.0, seed=None, host=HOST, port=0):
+        super().__init__((host, port), _FakeCameraHandler)
+        self.images = images  # list (nama_file, bytes, terdeteksi_manusia)
+        self.recorder = recorder
+        self.failure_rate = failure_rate
+        # RNG sendiri: listener meminta capture secara serial, sehingga urutan kegagalan dapat diulang
+        self.random = random.Random(seed)
+        self.delay = delay
+        self._counter = itertools.count()
+
+    @property
+    def url(self):
+        return f"http://{HOST}:{self.server_address[1]}/capture"
+
+    def next_image(self):
+        return self.images[next(self._counter) % len(self.images)]
+
+
+class _FakeCameraHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        camera = self.server
+        if self.path != "/capture":
+            self.send_error(404)
+            return
+        received_at = time.perf_counter()
+        if camera.delay:
+            time.sleep(camera.delay)
+        if camera.random.random() < camera.failure_rate:
+            camera.recorder.record_capture(received_at, None)
+            self.send_error(500, "Camera capture failed")
+            return
+
+        name, image_bytes, positive = camera.next_image()
+        capture_index = camera.recorder.record_capture(received_at, positive)
+        image_bytes = image_bytes + CAPTURE_TRAILER + str(capture_index).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Disposition", f"inline; filename={name}")
+        self.send_header("Content-Length", str(len(image_bytes)))
+        self.end_headers()
+        self.wfile.write(image_bytes)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ==================================================================
+# PENCATAT LATENSI
+# ==================================================================
+
+class StormRecorder:
+    """
+    Mencatat waktu setiap tahap rantai dan mengkorelasikannya per pesan motion.
+    Listener memproses pesan secara serial sesuai urutan broker, sehingga capture ke-i milik
+    motion ke-i. Setiap publish lampu yang berhasil dicatat bersama indeks capture dari request
+    /detect/upload yang memicunya, dan perintah lampu ke-j yang diterima subscriber adalah
+    publish ke-j (satu klien MQTT app.py, urutan terjaga). Kegagalan upload/publish di tengah
+    storm karena itu tidak menggeser korelasi motion berikutnya.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.published = {}        # seq -> waktu publish oleh PIR
+        self.routed = []           # seq motion (status 1) sesuai urutan broker
+        self.captures = []         # (waktu capture, positif/None jika gagal)
+        self.lamp_publishes = []   # indeks capture untuk setiap publish lampu yang berhasil, berurutan
+        self.lamps = []            # waktu perintah lampu diterima
+        self.lamp_payloads = []
+
+    def record_publish(self, seq, timestamp):
+        with self._lock:
+            self.published[seq] = timestamp
+
+    def on_route(self, topic, payload, timestamp):
+        if topic != MOTION_TOPIC:
+            return
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        if data.get("status_motion") == 1 and "seq" in data:
+            with self._lock:
+                self.routed.append(data["seq"])
+
+    def record_capture(self, timestamp, positive):
+        """Mencatat satu request /capture dan mengembalikan indeksnya."""
+        with self._lock:
+            self.captures.append((timestamp, positive))
+            return len(self.captures) - 1
+
+    def record_lamp_publish(self, capture_index):
+        with self._lock:
+            self.lamp_publishes.append(capture_index)
+
+    def record_lamp(self, timestamp, payload):
+        with self._lock:
+            self.lamps.append(timestamp)
+            self.lamp_payloads.append(payload)
+
+    def pending(self):
+        """Jumlah motion positif yang belum menghasilkan perintah lampu."""
+        with self._lock:
+            expected = sum(1 for _, positive in self.captures if positive)
+            return len(self.published) - len(self.captures) + expected - len(self.lamps)
+
+    def correlate(self):
+        """Mengembalikan list dict per motion: publish, capture, lamp (None jika tidak ada)."""
+        with self._lock:
+            rows = []
+            for i, seq in enumerate(self.routed):
+                capture_at, positive = self.captures[i] if i < len(self.captures) else (None, None)
+                rows.append({
+                    "seq": seq,
+                    "published_at": self.published.get(seq),
+                    "captured_at": capture_at,
+                    "positive": positive,
+                    "lamp_at": None
+                })
+            for capture_index, lamp_at in zip(self.lamp_publishes, self.lamps):
+                if capture_index is not None and capture_index < len(rows):
+                    rows[capture_index]["lamp_at"] = lamp_at
+        return rows
+
+
+def percentile(values, pct):
+    """Persentil nearest-rank dari list nilai (None jika kosong)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values_ms):
+    if not values_ms:
+        return {"count": 0}
+    return {
+        "count": len(values_ms),
+        "min": round(min(values_ms), 1),
+        "p50": round(percentile(values_ms, 50), 1),
+        "p90": round(percentile(values_ms, 90), 1),
+        "p95": round(percentile(values_ms, 95), 1),
+        "p99": round(percentile(values_ms, 99), 1),
+        "max": round(max(values_ms), 1),
+        "mean": round(sum(values_ms) / len(values_ms), 1)
+    }
+
+
+def build_report(recorder, args, elapsed):
+    rows = recorder.correlate()
+    published = len(recorder.published)
+    routed = len(rows)
+    captured = sum(1 for r in rows if r["captured_at"] is not None)
+    camera_failed = sum(1 for r in rows if r["captured_at"] is not None and r["positive"] is None)
+    negative_images = sum(1 for r in rows if r["positive"] is False)
+    expected_lamps = sum(1 for r in rows if r["positive"])
+    lamp_rows = [r for r in rows if r["lamp_at"] is not None]
+
+    def ms(start, end):
+        return (end - start) * 1000.0
+
+    # Motion yang seharusnya menyalakan lampu tetapi tidak: tidak sampai ke listener, tidak sempat
+    # diproses sebelum batas waktu drain, atau gagal di /detect/upload / publish MQTT.
+    # Kegagalan kamera yang disengaja dan gambar tanpa manusia tidak dihitung sebagai drop.
+    expected_total = published - camera_failed - negative_images
+    dropped = expected_total - len(lamp_rows)
+
+    return {
+        "config": {
+            "sensors": args.sensors,
+            "rate_per_sensor": args.rate,
+            "duration_s": args.duration,
+            "pattern": args.pattern,
+            "camera_failure_rate": args.camera_failure_rate,
+            "only_positive_images": args.only_positive
+        },
+        "elapsed_s": round(elapsed, 2),
+        "counts": {
+            "motion_published": published,
+            "motion_routed_by_broker": routed,
+            "camera_captures": captured,
+            "camera_failures": camera_failed,
+            "lamp_expected": expected_lamps,
+            "lamp_received": len(recorder.lamps)
+        },
+        "dropped": dropped,
+        "drop_rate": round(dropped / expected_total, 4) if expected_total > 0 else 0.0,
+        "latency_ms": {
+            "motion_to_capture": summarize([ms(r["published_at"], r["captured_at"]) for r in rows
+                                            if r["captured_at"] is not None and r["published_at"] is not None]),
+            "capture_to_lamp": summarize([ms(r["captured_at"], r["lamp_at"]) for r in lamp_rows]),
+            "motion_to_lamp": summarize([ms(r["published_at"], r["lamp_at"]) for r in lamp_rows
+                                         if r["published_at"] is not None])
+        }
+    }
+
+
+def print_report(report):
+    print("\n" + "=" * 66)
+    print(" LAPORAN MOTION STORM")
+    print("=" * 66)
+    for key, value in report["config"].items():
+        print(f"  {key:<28} {value}")
+    print(f"  {'elapsed_s':<28} {report['elapsed_s']}")
+    print("-" * 66)
+    for key, value in report["counts"].items():
+        print(f"  {key:<28} {value}")
+    print(f"  {'dropped':<28} {report['dropped']}")
+    print(f"  {'drop_rate':<28} {report['drop_rate'] * 100:.2f}%")
+    print("-" * 66)
+    print(f"  {'latency (ms)':<20} {'count':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for stage, stats in report["latency_ms"].items():
+        if stats["count"] == 0:
+            print(f"  {stage:<20} {0:>6}")
+            continue
+        print(f"  {stage:<20} {stats['count']:>6} {stats['p50']:>8} {stats['p90']:>8} "
+              f"{stats['p95']:>8} {stats['p99']:>8} {stats['max']:>8}")
+    print("=" * 66)
+
+
+# ==================================================================
+# KLIEN SIMULASI: PIR & LAMPU
+# ==================================================================
+
+def make_mqtt_client(client_id, port):
+    client = mqtt.Client(client_id=client_id)
+    connected = threading.Event()
+    client.on_connect = lambda c, userdata, flags, rc: connected.set()
+    client.connect(HOST, port, 60)
+    client.loop_start()
+    if not connected.wait(5):
+        raise RuntimeError(f"Klien MQTT '{client_id}' gagal terhubung ke broker lokal")
+    return client
+
+
+def run_pir_sensor(sensor_id, port, args, recorder, seq_counter, stop_at):
+    """Mensimulasikan satu sensor PIR: publish status_motion 1 lalu 0 setelah --hold detik."""
+    # RNG per sensor: jadwal tiap sensor dapat diulang dengan --seed walau thread berjalan paralel
+    rng = random.Random(None if args.seed is None else args.seed + sensor_id)
+    client = make_mqtt_client(f"SimPIR-{sensor_id}", port)
+    try:
+        while time.perf_counter() < stop_at:
+            if args.pattern == "poisson":
+                interval = rng.expovariate(args.rate)
+            else:
+                interval = 1.0 / args.rate
+            seq = next(seq_counter)
+            recorder.record_publish(seq, time.perf_counter())
+            client.publish(MOTION_TOPIC, json.dumps({"status_motion": 1, "sensor_id": sensor_id, "seq": seq}))
+            hold = min(args.hold, interval)
+            time.sleep(hold)
+            client.publish(MOTION_TOPIC, json.dumps({"status_motion": 0, "sensor_id": sensor_id}))
+            time.sleep(max(0.0, interval - hold))
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+def start_lamp_subscriber(port, recorder):
+    """Subscriber topik 'lamp' yang mencatat waktu terima setiap perintah (pengganti ESP8266 lampu)."""
+    client = make_mqtt_client("SimLamp", port)
+    client.on_message = lambda c, userdata, msg: recorder.record_lamp(time.perf_counter(), msg.payload.decode())
+    subscribed = threading.Event()
+    client.on_subscribe = lambda *a: subscribed.set()
+    client.subscribe(LAMP_TOPIC)
+    subscribed.wait(5)
+    return client
+
+
+# ==================================================================
+# PERSIAPAN RANTAI (app.py & listener.py ASLI)
+# ==================================================================
+
+def load_sample_images(analyze, only_positive):
+    """
+    Memuat gambar dari sample-foto/ dan mengklasifikasikannya dengan detektor HOG app.py,
+    sehingga rig tahu capture mana yang seharusnya menghasilkan perintah lampu.
+    """
+    import cv2
+    import numpy as np
+
+    images = []
+    for name in sorted(os.listdir(SAMPLE_FOLDER)):
+        with open(os.path.join(SAMPLE_FOLDER, name), 'rb') as f:
+            image_bytes = f.read()
+        img_np = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img_np is None:
+            continue
+        detected, _ = analyze(img_np)
+        print(f"   Sample {name}: {'manusia terdeteksi' if detected else 'tidak terdeteksi'}")
+        if detected or not only_positive:
+            images.append((name, image_bytes, detected))
+    if not images:
+        raise RuntimeError(f"Tidak ada gambar sample yang dapat dipakai di {SAMPLE_FOLDER}")
+    return images
+
+
+def parse_capture_index(image_bytes):
+    """Membaca indeks capture dari penanda CAPTURE_TRAILER (None jika tidak ada)."""
+    position = image_bytes.rfind(CAPTURE_TRAILER)
+    if position < 0:
+        return None
+    try:
+        return int(image_bytes[position + len(CAPTURE_TRAILER):])
+    except ValueError:
+        return None
+
+
+def trace_lamp_publishes(app, recorder):
+    """
+    Membungkus view /detect/upload dan app.publish_to_mqtt agar setiap publish lampu yang
+    berhasil dicatat bersama indeks capture milik request yang memicunya.
+    """
+    from flask import request
+
+    current = threading.local()
+    publish_lock = threading.Lock()
+    detect_view = app.app.view_functions['detect_from_upload']
+    publish_to_mqtt = app.publish_to_mqtt
+
+    def traced_detect_view(*args, **kwargs):
+        upload = request.files.get('file')
+        current.capture_index = None
+        if upload:
+            current.capture_index = parse_capture_index(upload.read())
+            upload.seek(0)
+        try:
+            return detect_view(*args, **kwargs)
+        finally:
+            current.capture_index = None
+
+    def traced_publish(topic, payload):
+        # Publish dan pencatatan dalam satu lock agar urutan catatan = urutan pesan ke broker
+        with publish_lock:
+            success, error = publish_to_mqtt(topic, payload)
+            if success and topic == LAMP_TOPIC:
+                recorder.record_lamp_publish(getattr(current, 'capture_index', None))
+        return success, error
+
+    app.app.view_functions['detect_from_upload'] = traced_detect_view
+    app.publish_to_mqtt = traced_publish
+
+
+def start_chain(broker_port, work_dir, recorder):
+    """Menyiapkan database sementara, menjalankan app.py (Flask) dan listener.py terhadap broker lokal."""
+    import database_setup
+    database_setup.DATABASE_NAME = os.path.join(work_dir, "detection_history.db")
+
+    # app.py membaca konfigurasi ini dan terhubung ke broker saat di-import,
+    # sehingga harus diisi sebelum import. Skema DB dibuat oleh app.py sendiri.
+    os.environ["INVESTIGATION_FOLDER"] = os.path.join(work_dir, "foto-investigation")
+    os.environ["MQTT_BROKER"] = HOST
+    os.environ["MQTT_PORT"] = str(broker_port)
+    import app
+
+    deadline = time.time() + 5
+    while not app.mqtt_client._is_connected and time.time() < deadline:
+        time.sleep(0.05)
+    if not app.mqtt_client._is_connected:
+        raise RuntimeError("app.py gagal terhubung ke broker lokal")
+    trace_lamp_publishes(app, recorder)
+
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # Log akses per request mengganggu laporan
+    flask_server = make_server(HOST, 0, app.app, threaded=True)
+    threading.Thread(target=flask_server.serve_forever, daemon=True).start()
+
+    import listener
+    listener.FLASK_DETECT_URL = f"http://{HOST}:{flask_server.server_port}/detect/upload"
+    listener_client = mqtt.Client(client_id="PythonListener")
+    listener_client.on_connect = listener.on_connect
+    listener_client.on_message = listener.on_message
+    listener_client.connect(HOST, broker_port, 60)
+    listener_client.loop_start()
+    return app, listener, flask_server, listener_client
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulasi motion storm end-to-end: PIR -> listener -> kamera -> app -> lampu")
+    parser.add_argument("--sensors", type=int, default=3, help="Jumlah sensor PIR simulasi")
+    parser.add_argument("--rate", type=float, default=0.5, help="Rata-rata event motion per detik per sensor")
+    parser.add_argument("--duration", type=float, default=20, help="Lama storm (detik)")
+    parser.add_argument("--pattern", choices=["periodic", "poisson"], default="poisson", help="Pola waktu antar event")
+    parser.add_argument("--hold", type=float, default=0.2, help="Detik sebelum PIR mengirim status_motion 0")
+    parser.add_argument("--drain-timeout", type=float, default=60, help="Batas waktu menunggu antrean selesai setelah storm (detik)")
+    parser.add_argument("--camera-delay", type=float, default=0.0, help="Tambahan delay respon /capture kamera (detik)")
+    parser.add_argument("--camera-failure-rate", type=float, default=0.0, help="Peluang /capture mengembalikan HTTP 500")
+    parser.add_argument("--include-negatives", dest="only_positive", action="store_false",
+                        help="Sajikan juga gambar sample yang tidak terdeteksi manusia")
+    parser.add_argument("--seed", type=int, default=None, help="Seed RNG per sensor dan kamera: jadwal motion tiap sensor dan urutan kegagalan kamera dapat diulang (interleaving antar thread tetap bergantung waktu)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Simpan laporan ke file JSON")
+    parser.add_argument("--keep", action="store_true", help="Jangan hapus folder kerja sementara (DB & foto)")
+    parser.add_argument("--max-drop-rate", type=float, default=None,
+                        help="Gagal (exit code 1) jika drop rate melebihi nilai ini (0-1)")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="Gagal (exit code 1) jika p95 latensi motion-to-lamp melebihi nilai ini (ms)")
+    args = parser.parse_args()
+
+    if args.sensors < 1:
+        parser.error("--sensors harus >= 1")
+    if args.rate <= 0:
+        parser.error("--rate harus > 0")
+    if args.duration <= 0:
+        parser.error("--duration harus > 0")
+    if not 0.0 <= args.camera_failure_rate <= 1.0:
+        parser.error("--camera-failure-rate harus di antara 0 dan 1")
+    return args
+
+
+def check_thresholds(report, args):
+    """Mengembalikan daftar pelanggaran batas --max-drop-rate / --max-p95-ms (kosong jika lolos)."""
+    failures = []
+    if args.max_drop_rate is not None and report["drop_rate"] > args.max_drop_rate:
+        failures.append(f"drop_rate {report['drop_rate']} > {args.max_drop_rate}")
+    if args.max_p95_ms is not None:
+        p95 = report["latency_ms"]["motion_to_lamp"].get("p95")
+        if p95 is None:
+            failures.append("tidak ada perintah lampu yang diterima untuk menghitung p95")
+        elif p95 > args.max_p95_ms:
+            failures.append(f"p95 motion_to_lamp {p95} ms > {args.max_p95_ms} ms")
+    return failures
+
+
+def main():
+    args = parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="motion-storm-")
+    recorder = StormRecorder()
+    broker = LocalMqttBroker(on_route=recorder.on_route)
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    print(f"✅ Broker MQTT lokal berjalan di {HOST}:{broker.port}")
+
+    app, listener, flask_server, listener_client = start_chain(broker.port, work_dir, recorder)
+    images = load_sample_images(app.analyze_human_detection, args.only_positive)
+
+    camera = FakeCameraServer(images, recorder, args.camera_failure_rate, args.camera_delay, args.seed)
+    threading.Thread(target=camera.serve_forever, daemon=True).start()
+    listener.CAMERA_IMAGE_API_URL = camera.url
+    print(f"✅ Kamera palsu berjalan di {camera.url} ({len(images)} gambar)")
+
+    lamp_client = start_lamp_subscriber(broker.port, recorder)
+    print(f"✅ Subscriber lampu siap. Memulai storm: {args.sensors} sensor x {args.rate}/detik selama {args.duration} detik")
+
+    try:
+        started = time.perf_counter()
+        stop_at = started + args.duration
+        seq_counter = itertools.count(1)
+        sensors = [
+            threading.Thread(target=run_pir_sensor, args=(i + 1, broker.port, args, recorder, seq_counter, stop_at))
+            for i in range(args.sensors)
+        ]
+        for sensor in sensors:
+            sensor.start()
+        for sensor in sensors:
+            sensor.join()
+
+        print(f"Storm selesai. Menunggu antrean diproses (maks {args.drain_timeout} detik)...")
+        drain_deadline = time.perf_counter() + args.drain_timeout
+        while recorder.pending() > 0 and time.perf_counter() < drain_deadline:
+            time.sleep(0.2)
+        # Beri waktu perintah lampu terakhir sampai ke subscriber
+        time.sleep(0.5)
+        elapsed = time.perf_counter() - started
+
+        report = build_report(recorder, args, elapsed)
+        print_report(report)
+        if args.json_path:
+            with open(args.json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"✅ Laporan disimpan ke {args.json_path}")
+
+        failures = check_thresholds(report, args)
+        for failure in failures:
+            print(f"❌ Batas terlampaui: {failure}")
+        exit_code = 1 if failures else 0
+    finally:
+        # Tutup event session yang masih terbuka agar DB sementara konsisten (berguna dengan --keep)
+        for session in app.session_manager.pop_all():
+            app.close_event_session(session)
+        for client in (lamp_client, listener_client, app.mqtt_client):
+            client.loop_stop()
+            client.disconnect()
+        flask_server.shutdown()
+        camera.shutdown()
+        broker.shutdown()
+        if args.keep:
+            print(f"Folder kerja disimpan di: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
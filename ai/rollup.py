@@ -0,0 +1,128 @@
+# rollup.py
+
+import sys
+
+from database_setup import get_db_connection
+
+# --- Konfigurasi Rollup ---
+DEFAULT_CAMERA_ID = "default"
+
+# Granularitas -> jumlah karakter prefix kolom datetime ('YYYY-MM-DD HH:MM:SS')
+# dan suffix pelengkap agar bucket tetap berformat datetime penuh.
+# Dengan format ini bucket dapat dibandingkan secara leksikal untuk range query.
+ROLLUP_GRANULARITIES = {
+    "minute": (16, ":00"),
+    "hour": (13, ":00:00"),
+    "day": (10, " 00:00:00"),
+}
+# --------------------------
+
+
+def bucket_for(dt_text, granularity):
+    """Mengubah string datetime history menjadi awal bucket untuk granularitas tertentu."""
+    length, suffix = ROLLUP_GRANULARITIES[granularity]
+    return dt_text[:length] + suffix
+
+
+def apply_rollup(conn, camera_id, dt_text, detected, person_count):
+    """
+    Memperbarui tabel 'history_rollup' secara inkremental untuk satu baris history.
+    Dipanggil di dalam transaksi yang sama dengan INSERT ke tabel 'history',
+    sehingga rollup selalu konsisten dengan data mentah. Commit dilakukan oleh pemanggil.
+    """
+    person_count = person_count or 0
+    detected = 1 if detected else 0
+    for granularity in ROLLUP_GRANULARITIES:
+        conn.execute(
+            """
+            INSERT INTO history_rollup
+                (camera_id, granularity, bucket, frame_count, detection_count, person_count_sum, person_count_max)
+            VALUES (?, ?, ?, 1, ?, ?, ?)
+            ON CONFLICT (granularity, bucket, camera_id) DO UPDATE SET
+                frame_count = frame_count + 1,
+                detection_count = detection_count + excluded.detection_count,
+                person_count_sum = person_count_sum + excluded.person_count_sum,
+                person_count_max = MAX(person_count_max, excluded.person_count_max)
+            """,
+            (camera_id, granularity, bucket_for(dt_text, granularity), detected, person_count, person_count)
+        )
+
+
+def query_rollups(conn, granularity, start=None, end=None, camera_id=None):
+    """
+    Mengambil bucket rollup untuk granularitas tertentu yang beririsan dengan rentang [start, end):
+    bucket yang memuat 'start' ikut dikembalikan, bucket yang dimulai pada/sesudah 'end' tidak.
+    Pemanggil wajib memastikan start < end.
+    Query memakai primary key (granularity, bucket, camera_id), bukan tabel 'history'.
+    """
+    sql = (
+        "SELECT camera_id, bucket, frame_count, detection_count, person_count_sum, person_count_max "
+        "FROM history_rollup WHERE granularity = ?"
+    )
+    params = [granularity]
+    if camera_id:
+        sql += " AND camera_id = ?"
+        params.append(camera_id)
+    if start:
+        sql += " AND bucket >= ?"
+        params.append(bucket_for(start, granularity))
+    if end:
+        sql += " AND bucket < ?"
+        params.append(end)
+    sql += " ORDER BY bucket ASC, camera_id ASC"
+    return conn.execute(sql, params).fetchall()
+
+
+def backfill_rollups(force=False):
+    """
+    Membangun ulang seluruh isi 'history_rollup' dari tabel 'history'.
+    Digunakan sekali untuk data lama yang sudah ada sebelum rollup diaktifkan,
+    atau untuk memperbaiki rollup jika data history diubah secara manual.
+
+    Jika event session sudah pernah dicatat, tabel 'history' hanya berisi keyframe,
+    sedangkan rollup live menghitung setiap frame. Backfill akan menimpa angka yang benar
+    dengan angka yang lebih kecil, sehingga ditolak kecuali force=True.
+    Mengembalikan True jika backfill dijalankan.
+    """
+    conn = get_db_connection()
+    try:
+        session_count = conn.execute("SELECT COUNT(*) FROM event_session").fetchone()[0]
+        if session_count and not force:
+            print(f"❌ Backfill dibatalkan: terdapat {session_count} event session. Tabel 'history' hanya "
+                  "menyimpan keyframe sehingga backfill akan menimpa rollup dengan jumlah frame yang lebih kecil. "
+                  "Gunakan 'python rollup.py backfill --force' jika tetap ingin menjalankannya.")
+            return False
+
+        conn.execute("DELETE FROM history_rollup")
+        for granularity, (length, suffix) in ROLLUP_GRANULARITIES.items():
+            conn.execute(
+                f"""
+                INSERT INTO history_rollup
+                    (camera_id, granularity, bucket, frame_count, detection_count, person_count_sum, person_count_max)
+                SELECT
+                    COALESCE(camera_id, ?),
+                    ?,
+                    substr(datetime, 1, {length}) || ?,
+                    COUNT(*),
+                    SUM(CASE WHEN detection_status = 'Detected' THEN 1 ELSE 0 END),
+                    SUM(COALESCE(person_count, 0)),
+                    MAX(COALESCE(person_count, 0))
+                FROM history
+                GROUP BY 1, 3
+                """,
+                (DEFAULT_CAMERA_ID, granularity, suffix)
+            )
+            print(f"✅ Rollup '{granularity}' berhasil dibangun ulang.")
+        conn.commit()
+        total = conn.execute("SELECT COUNT(*) FROM history_rollup").fetchone()[0]
+        print(f"✅ Backfill selesai. Total bucket rollup: {total}")
+        return True
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        backfill_rollups(force="--force" in sys.argv[2:])
+    else:
+        print("Penggunaan: python rollup.py backfill [--force]")